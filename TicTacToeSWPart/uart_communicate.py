@@ -1,8 +1,30 @@
+import collections
+import io
+import os
+import selectors
+import threading
+import time
 import serial
 import serial.tools.list_ports
 import tkinter as tk
+from functools import partial
 from tkinter import ttk, scrolledtext
 
+DRAIN_MS = 16  # How often the GUI drains the lines queued by the reader thread (~60 Hz)
+RX_RING_SIZE = 4096  # Received lines kept while the GUI catches up, oldest are overwritten
+MAX_OUTPUT_LINES = 1000  # Lines kept in the output text area
+SELECT_TIMEOUT = 0.05  # Seconds the reader waits for data before checking whether it should stop
+RX_BUFFER_SIZE = 1024  # Bytes fetched per read() by the buffered line reader
+PORTS_TTL = 2.0  # Seconds during which list_ports() reuses the last enumeration
+
+BACKGROUND = "#FFF3E0"  # Soft peach background color
+HEADER = "#FF7043"
+GREEN = "#43A047"  # Dark green
+SENT_GREEN = "#388E3C"
+RED = "#D32F2F"
+ORANGE = "#FB8C00"
+BUTTON = "#FFB74D"  # Soft orange
+
 
 class UARTCommunication:
     def __init__(self):
@@ -10,11 +32,23 @@ class UARTCommunication:
         self.baud_rate = 9600
         self.access_denied_shown = False
         self.stop_auto_receive = False
+        self.rx_ring = collections.deque(maxlen=RX_RING_SIZE)
+        self.reader = None
+        self.wake_r = None  # Wake-up pipe watched by a Tk file handler (POSIX only)
+        self.wake_w = None
+        self.ports_cache = ()
+        self.ports_ts = None
 
-    def list_ports(self):
-        return [port.device for port in serial.tools.list_ports.comports()]
+    def list_ports(self, refresh=False):
+        # Port enumeration is slow on Windows, so reuse the result for a short while
+        now = time.monotonic()
+        if refresh or self.ports_ts is None or now - self.ports_ts >= PORTS_TTL:
+            self.ports_cache = tuple(port.device for port in serial.tools.list_ports.comports())
+            self.ports_ts = now
+        return self.ports_cache
 
     def open_port(self, port):
+        self.reader = None
         if self.ser and self.ser.is_open:
             self.ser.close()
 
@@ -22,6 +56,7 @@ class UARTCommunication:
             self.ser = serial.Serial(port, self.baud_rate, timeout=1)
             self.access_denied_shown = False
             self.stop_auto_receive = False
+            self.start_reader()
             return f"Connected to {port} at {self.baud_rate} baud"
         except serial.SerialException as e:
             self.ser = None
@@ -42,9 +77,94 @@ class UARTCommunication:
     def set_baud_rate(self, baud_rate):
         self.baud_rate = baud_rate
         if self.ser and self.ser.is_open:
+            self.reader = None
             self.ser.close()
             self.ser.baudrate = baud_rate
             self.ser.open()
+            self.start_reader()
+
+    def start_reader(self):
+        # Blocking reads happen on a daemon thread so readline() never freezes the GUI
+        self.reader = threading.Thread(target=self.reader_loop, args=(self.ser,), daemon=True)
+        self.reader.start()
+
+    def reader_loop(self, ser):
+        # Sleep in epoll/kqueue until the port is readable where possible, Windows blocks in readline() instead
+        selector = port_selector(ser)
+        if selector is not None:
+            # pyserial's readline() issues a read(1) per byte, let the C BufferedReader frame the lines instead
+            buffered = io.BufferedReader(io.FileIO(ser.fileno(), "rb", closefd=False), RX_BUFFER_SIZE)
+        pending = bytearray()  # Start of a line whose end has not arrived yet, owned by this reader
+        try:
+            while self.reader is threading.current_thread() and not self.stop_auto_receive:
+                try:
+                    if selector is None:
+                        lines = [ser.readline()]
+                    elif selector.select(timeout=SELECT_TIMEOUT):
+                        lines = self.read_available(buffered, pending)
+                    else:
+                        continue
+                except Exception as e:
+                    if self.reader is threading.current_thread():  # Not a close/reopen by the GUI
+                        # Queue the error before raising the flag, _tick drains once more when it sees the flag
+                        self.rx_ring.append(f"Error: {e}")
+                        self.stop_auto_receive = True
+                        self.wake()
+                    break
+                received = False
+                for line in lines:
+                    response = decode_line(line)
+                    if response:
+                        self.rx_ring.append(response)
+                        received = True
+                if received:
+                    self.wake()
+        finally:
+            if selector is not None:
+                selector.close()
+
+    def read_available(self, buffered, pending):
+        # The port is non-blocking, so readline() returns a partial line (or b"") once the data runs out
+        lines = []
+        line = buffered.readline()
+        if not line:
+            # Readable without data means hangup/EOF, raise like pyserial's read() instead of spinning on select()
+            raise serial.SerialException("device reports readiness to read but returned no data "
+                                         "(device disconnected or multiple access on port?)")
+        while line:
+            if line[-1:] != b"\n":
+                pending += line
+                break
+            if pending:
+                line = pending + line
+                pending.clear()
+            lines.append(line)
+            line = buffered.readline()
+        return lines
+
+    def watch(self, root, callback):
+        # Let Tk call back as soon as the reader thread has data instead of polling (POSIX only)
+        if not hasattr(root.tk, "createfilehandler"):
+            return False
+        if self.wake_r is None:
+            self.wake_r, self.wake_w = os.pipe()
+            os.set_blocking(self.wake_w, False)
+
+        def on_wake(fd, mask):
+            os.read(fd, 4096)
+            callback()
+
+        root.tk.createfilehandler(self.wake_r, tk.READABLE, on_wake)
+        if self.rx_ring:
+            self.wake()  # Lines queued by the reader before the pipe existed were not signalled
+        return True
+
+    def wake(self):
+        if self.wake_w is not None:
+            try:
+                os.write(self.wake_w, b"\0")
+            except BlockingIOError:
+                pass  # Pipe is full, a wake-up is already pending
 
     def send_message(self, message):
         if self.ser and self.ser.is_open:
@@ -55,7 +175,7 @@ class UARTCommunication:
     def receive_message(self):
         if self.ser and self.ser.is_open:
             try:
-                response = self.ser.readline().decode("utf-8", errors="replace").strip()
+                response = decode_line(self.ser.readline())
                 if response:
                     return response
             except Exception as e:
@@ -64,32 +184,60 @@ class UARTCommunication:
         return "Port not opened"
 
 
-def auto_receive(uart, output_text, status_label, root):
-    if uart.stop_auto_receive:
-        return
+def port_selector(ser):
+    selector = selectors.DefaultSelector()
+    try:
+        selector.register(ser.fileno(), selectors.EVENT_READ)
+    except (OSError, ValueError):  # No selectable descriptor, e.g. io.UnsupportedOperation on Windows
+        selector.close()
+        return None
+    return selector
 
-    response = uart.receive_message()
-    if response and response != "Port not opened":
-        output_text.insert(tk.END, f"Received: {response}\n")
+
+def decode_line(raw):
+    # Cut the line terminator off by index instead of strip(), which would copy the string once more
+    end = len(raw)
+    if end and raw[end - 1] == 0x0A:
+        end -= 1
+    if end and raw[end - 1] == 0x0D:
+        end -= 1
+    return raw[:end].decode("utf-8", errors="replace")
+
+
+def auto_receive(uart, output_text, status_label, root):
+    if uart.rx_ring:
+        while uart.rx_ring:
+            output_text.insert(tk.END, f"Received: {uart.rx_ring.popleft()}\n")
+        # Every line ends with "\n", so "end-1c" is on the empty line after the last one
+        excess = int(output_text.index("end-1c").split(".")[0]) - 1 - MAX_OUTPUT_LINES
+        if excess > 0:
+            output_text.delete("1.0", f"{excess + 1}.0")
         output_text.see(tk.END)
-    root.after(100, lambda: auto_receive(uart, output_text, status_label, root))
 
 
 def start_gui():
     uart = UARTCommunication()
     root = tk.Tk()
     root.title("UART Communication Interface")
-    root.configure(bg="#FFF3E0")  # Soft peach background color
+    root.configure(bg=BACKGROUND)
+
+    # Label styles are configured once, status updates only switch between them
+    style = ttk.Style(root)
+    style.configure("TLabel", font=("Arial", 12), background=BACKGROUND)
+    style.configure("Header.TLabel", font=("Arial", 18, "bold"), foreground="white", background=HEADER)
+    style.configure("Ok.TLabel", foreground=GREEN)
+    style.configure("Sent.TLabel", foreground=SENT_GREEN)
+    style.configure("Error.TLabel", foreground=RED)
+    style.configure("Pending.TLabel", foreground=ORANGE)
 
     # Header Section
-    header_frame = tk.Frame(root, bg="#FF7043", pady=15)
+    header_frame = tk.Frame(root, bg=HEADER, pady=15)
     header_frame.grid(row=0, column=0, columnspan=3, sticky="ew")
-    header_label = tk.Label(header_frame, text="UART Communication Interface", font=("Arial", 18, "bold"), fg="white",
-                            bg="#FF7043")
+    header_label = ttk.Label(header_frame, text="UART Communication Interface", style="Header.TLabel")
     header_label.pack()
 
     # Port Selection
-    port_label = tk.Label(root, text="Select Port:", font=("Arial", 12), bg="#FFF3E0")
+    port_label = ttk.Label(root, text="Select Port:")
     port_label.grid(row=1, column=0, padx=20, pady=10, sticky="w")
 
     port_var = tk.StringVar()
@@ -97,8 +245,11 @@ def start_gui():
                                  font=("Arial", 12))
     port_combobox.grid(row=1, column=1, padx=10, pady=10)
 
+    def refresh_ports():
+        port_combobox.config(values=uart.list_ports(refresh=True))
+
     # Baud Rate Selection
-    baud_label = tk.Label(root, text="Baud Rate:", font=("Arial", 12), bg="#FFF3E0")
+    baud_label = ttk.Label(root, text="Baud Rate:")
     baud_label.grid(row=2, column=0, padx=20, pady=10, sticky="w")
 
     baud_var = tk.StringVar(value="9600")
@@ -110,19 +261,24 @@ def start_gui():
         try:
             baud_rate = int(baud_var.get())
             uart.set_baud_rate(baud_rate)
-            status_label.config(text=f"Baud rate set to {baud_rate}", fg="#43A047")  # Dark green
+            status_label.config(text=f"Baud rate set to {baud_rate}", style="Ok.TLabel")
         except ValueError:
-            status_label.config(text="Invalid baud rate selected", fg="#D32F2F")  # Red
+            status_label.config(text="Invalid baud rate selected", style="Error.TLabel")
 
     baud_combobox.bind("<<ComboboxSelected>>", lambda _: update_baud_rate())
 
+    # Refresh Ports Button (Soft Orange)
+    refresh_button = tk.Button(root, text="Refresh Ports", command=refresh_ports, bg=BUTTON, fg="white",
+                               font=("Arial", 12, "bold"), relief="flat", width=15, height=2, borderwidth=3)
+    refresh_button.grid(row=2, column=2, padx=20, pady=10)
+
     # Open Port Button (Soft Orange)
-    open_button = tk.Button(root, text="Open Port", command=lambda: open_port_callback(), bg="#FFB74D", fg="white",
+    open_button = tk.Button(root, text="Open Port", command=lambda: open_port_callback(), bg=BUTTON, fg="white",
                             font=("Arial", 12, "bold"), relief="flat", width=15, height=2, borderwidth=3)
     open_button.grid(row=1, column=2, padx=20, pady=10)
 
     # Send Message Section
-    message_label = tk.Label(root, text="Message:", font=("Arial", 12), bg="#FFF3E0")
+    message_label = ttk.Label(root, text="Message:")
     message_label.grid(row=3, column=0, padx=20, pady=10, sticky="w")
 
     message_entry = tk.Entry(root, width=25, font=("Arial", 12))  # No border
@@ -130,10 +286,10 @@ def start_gui():
 
     def send_message_callback():
         status = uart.send_message(message_entry.get())
-        status_label.config(text=status, fg="#388E3C" if "Sent" in status else "#D32F2F")  # Green for success, red for error
+        status_label.config(text=status, style="Sent.TLabel" if "Sent" in status else "Error.TLabel")
 
     # Send Button (Soft Orange)
-    send_button = tk.Button(root, text="Send", command=send_message_callback, bg="#FFB74D", fg="white",
+    send_button = tk.Button(root, text="Send", command=send_message_callback, bg=BUTTON, fg="white",
                             font=("Arial", 12, "bold"), relief="flat", width=15, height=2, borderwidth=3)
     send_button.grid(row=3, column=2, padx=20, pady=10)
 
@@ -143,16 +299,32 @@ def start_gui():
     output_text.grid(row=4, column=0, columnspan=3, padx=20, pady=10)
 
     # Status Label
-    status_label = tk.Label(root, text="Status: Not connected", fg="#FB8C00", font=("Arial", 12), bg="#FFF3E0")  # Orange for initial status
+    status_label = ttk.Label(root, text="Status: Not connected", style="Pending.TLabel")
     status_label.grid(row=5, column=0, columnspan=3, padx=20, pady=10)
 
+    # Fallback for platforms without Tk file handlers (Windows), one chain drains the ring until the reader stops
+    polling = False
+
+    def _tick():
+        nonlocal polling
+        auto_receive(uart, output_text, status_label, root)
+        if uart.stop_auto_receive:
+            # The reader queues its error before raising the flag, drain once more so the error is shown
+            auto_receive(uart, output_text, status_label, root)
+            polling = False
+            return
+        root.after(DRAIN_MS, _tick)
+
     # Open Port Callback
     def open_port_callback():
+        nonlocal polling
         status = uart.open_port(port_var.get())
         if status:
-            status_label.config(text=status, fg="#43A047" if "Connected" in status else "#D32F2F")  # Green for success, red for error
+            status_label.config(text=status, style="Ok.TLabel" if "Connected" in status else "Error.TLabel")
         if "Connected" in status:
-            auto_receive(uart, output_text, status_label, root)
+            if not uart.watch(root, partial(auto_receive, uart, output_text, status_label, root)) and not polling:
+                polling = True
+                _tick()
 
     # Run the GUI
     root.mainloop()
@@ -3,14 +3,54 @@
 @brief Python GUI and serial communication interface for a Tic-Tac-Toe game.
 """
 
+import collections
+import os
+import re
+import selectors
 import threading
+import time
 import serial
 import serial.tools.list_ports
 import json
 import tkinter as tk
+from functools import partial
 from tkinter import ttk, scrolledtext
 from tkinter import messagebox
 
+try:
+    import orjson
+
+    def _dumps_line(obj):
+        # The newline is appended by the encoder itself, so a frame is a single bytes object
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+
+    _loads = orjson.loads
+except ImportError:  # orjson is optional, fall back to the standard library encoder
+    def _dumps_line(obj):
+        return (json.dumps(obj, separators=(",", ":")) + "\n").encode()
+
+    _loads = json.loads
+
+## Interval (ms) at which the GUI drains the frames queued by the reader thread (~60 Hz).
+_DRAIN_MS = 16
+## Seconds the reader thread waits for data before checking whether it has been replaced.
+_SELECT_TIMEOUT = 0.05
+## Capacity of the RX ring buffer; the oldest frames are overwritten when the GUI falls behind.
+_RX_RING_SIZE = 4096
+## Number of lines kept in the output text area.
+_MAX_OUTPUT_LINES = 1000
+## Pre-serialized command frames; the command shapes are fixed, so no dict or JSON encoder is needed.
+_MOVE_TMPL = b'{"command":"MOVE","row":%d,"col":%d}\n'
+_MODE_TMPL = b'{"command":"MODE","mode":%d}\n'
+_RESET_BYTES = b'{"command":"RESET"}\n'
+## Font of the game board buttons, set once when the buttons are created.
+_FONT = ("Arial", 14)
+## Exact shape of the board frames sent by the sketch (cells "X", "O" or " "), matched without going through the JSON decoder.
+_BOARD_RE = re.compile(rb'\{"type":"board","board":\[\["([XO ])","([XO ])","([XO ])"\],\["([XO ])","([XO ])","([XO ])"\],'
+                       rb'\["([XO ])","([XO ])","([XO ])"\]\]\}\s*\Z')
+## Seconds during which list_ports() reuses the previous port enumeration.
+_PORTS_TTL = 2.0
+
 class UARTCommunication:
     """
     @class UARTCommunication
@@ -21,14 +61,28 @@ class UARTCommunication:
         @brief Constructor initializes the serial connection as None.
         """
         self.ser = None
-
-    def list_ports(self):
+        self.rx_ring = collections.deque(maxlen=_RX_RING_SIZE)
+        self._reader = None
+        self._wake_r = None
+        self._wake_w = None
+        self.last_board = [[" "] * 3 for _ in range(3)]
+        self._ports_cache = ()
+        self._ports_ts = None
+
+    def list_ports(self, refresh=False):
         """
         @brief Lists all available serial ports.
 
-        @return A list of available port names.
+        The enumeration is cached for _PORTS_TTL seconds since it is slow on Windows.
+
+        @param refresh Forces a new enumeration, ignoring the cache.
+        @return A tuple of available port names.
         """
-        return [port.device for port in serial.tools.list_ports.comports()]
+        now = time.monotonic()
+        if refresh or self._ports_ts is None or now - self._ports_ts >= _PORTS_TTL:
+            self._ports_cache = tuple(port.device for port in serial.tools.list_ports.comports())
+            self._ports_ts = now
+        return self._ports_cache
 
     def open_port(self, port, baud_rate=9600):
         """
@@ -38,13 +92,111 @@ class UARTCommunication:
         @param baud_rate The baud rate for the connection (default: 9600).
         @return A message indicating success or error.
         """
+        self._reader = None
         try:
             self.ser = serial.Serial(port, baud_rate, timeout=1)
+            self._reader = threading.Thread(target=self._reader_loop, args=(self.ser,), daemon=True)
+            self._reader.start()
             return f"Connected to {port}"
         except Exception as e:
             self.ser = None
             return f"Error: {e}"
 
+    def _reader_loop(self, ser):
+        """
+        @brief Reads lines on a background thread and queues the decoded frames for the GUI.
+
+        Where the port has a selectable descriptor (POSIX), the thread sleeps in a selector
+        (epoll/kqueue) until data arrives; elsewhere it blocks in read(). The loop exits once
+        another reader replaces it or the port fails.
+
+        @param ser The serial connection to read from.
+        """
+        selector = _port_selector(ser)
+        buf = bytearray()  # Owned by this reader, a replaced one may still be inside read()
+        try:
+            while self._reader is threading.current_thread():
+                try:
+                    if selector is not None and not selector.select(timeout=_SELECT_TIMEOUT):
+                        continue
+                    lines = self._read_lines(ser, buf)
+                except Exception as e:
+                    if self._reader is threading.current_thread():
+                        self.rx_ring.append((None, f"Error: {e}"))
+                        self._wake()
+                    break
+                received = False
+                for line in lines:
+                    if line and not line.isspace():
+                        self.rx_ring.append(decode_frame(line))
+                        received = True
+                if received:
+                    self._wake()
+        finally:
+            if selector is not None:
+                selector.close()
+
+    def watch(self, root, callback):
+        """
+        @brief Runs a callback on the Tk main loop as soon as the reader thread queues frames.
+
+        The reader thread writes to a wake-up pipe watched by a Tk file handler, so frames are
+        handled without polling. Frames already queued when it is installed are signalled at once.
+        Tk file handlers only exist on POSIX; elsewhere the caller has to poll rx_ring instead.
+
+        @param root The main tkinter window.
+        @param callback Called without arguments on the Tk thread when frames are pending.
+        @return True if the file handler was installed, False if the caller must poll.
+        """
+        if not hasattr(root.tk, "createfilehandler"):
+            return False
+        if self._wake_r is None:
+            self._wake_r, self._wake_w = os.pipe()
+            os.set_blocking(self._wake_w, False)
+
+        def on_wake(fd, mask):
+            os.read(fd, 4096)
+            callback()
+
+        root.tk.createfilehandler(self._wake_r, tk.READABLE, on_wake)
+        if self.rx_ring:
+            self._wake()  # Frames queued by the reader before the pipe existed were not signalled
+        return True
+
+    def _wake(self):
+        """
+        @brief Wakes the Tk main loop after frames were queued, if watch() is active.
+        """
+        if self._wake_w is not None:
+            try:
+                os.write(self._wake_w, b"\0")
+            except BlockingIOError:
+                pass  # The pipe is full, a wake-up is already pending
+
+    def _read_lines(self, ser, buf):
+        """
+        @brief Reads everything pending on the serial connection and splits it into lines.
+
+        A single read() drains the whole burst instead of one readline() per frame. It blocks
+        for at most the port timeout while nothing is pending, and an incomplete trailing
+        line is kept until the rest of it arrives. The reader's bytearray is reused as the
+        receive buffer, so each line costs a single slice.
+
+        @param ser The serial connection to read from.
+        @param buf The receive buffer of the calling reader, updated in place.
+        @return A list of the complete raw lines received, still carrying any trailing "\\r".
+        """
+        buf += ser.read(ser.in_waiting or 1)
+        lines = []
+        start = 0
+        end = buf.find(b"\n")
+        while end >= 0:
+            lines.append(buf[start:end])
+            start = end + 1
+            end = buf.find(b"\n", start)
+        del buf[:start]
+        return lines
+
     def send_message(self, message):
         """
         @brief Sends a JSON-encoded message over the serial connection.
@@ -54,9 +206,24 @@ class UARTCommunication:
         """
         if self.ser and self.ser.is_open:
             try:
-                json_message = json.dumps(message)
-                self.ser.write((json_message + "\n").encode())
-                return f"Sent: {json_message}"
+                payload = _dumps_line(message)
+                self.ser.write(payload)
+                return f"Sent: {payload.decode().rstrip()}"
+            except Exception as e:
+                return f"Error: {e}"
+        return "Port not opened"
+
+    def send_bytes(self, payload):
+        """
+        @brief Sends an already encoded, newline-terminated frame over the serial connection.
+
+        @param payload The raw bytes of the frame.
+        @return A message indicating success or error.
+        """
+        if self.ser and self.ser.is_open:
+            try:
+                self.ser.write(payload)
+                return f"Sent: {payload.decode().rstrip()}"
             except Exception as e:
                 return f"Error: {e}"
         return "Port not opened"
@@ -65,31 +232,86 @@ class UARTCommunication:
         """
         @brief Receives a JSON-encoded message from the serial connection.
 
+        This is a synchronous read; the GUI relies on the reader thread started by open_port instead.
+
         @return A dictionary with the received data, or an error message.
         """
         if self.ser and self.ser.is_open:
             try:
                 if self.ser.in_waiting > 0:
-                    response = self.ser.readline().decode().strip()
-                    if response:
-                        json_response = json.loads(response)
-                        return json_response
+                    line = self.ser.readline()
+                    if line and not line.isspace():
+                        return _loads(line)
             except json.JSONDecodeError:
                 return "Error: Invalid JSON received"
             except Exception as e:
                 return f"Error: {e}"
         return "Port not opened"
 
-def update_game_board(board, buttons):
+def _port_selector(ser):
+    """
+    @brief Creates a selector that waits for the serial port to become readable.
+
+    @param ser The serial connection.
+    @return The selector, or None if the port has no selectable descriptor (e.g. on Windows).
+    """
+    selector = selectors.DefaultSelector()
+    try:
+        selector.register(ser.fileno(), selectors.EVENT_READ)
+    except (OSError, ValueError):  # Including io.UnsupportedOperation from fileno()
+        selector.close()
+        return None
+    return selector
+
+def decode_frame(line):
+    """
+    @brief Decodes a raw line received from the Arduino into a (type, payload) tuple.
+
+    Board updates, the bulk of the traffic, are matched directly on the bytes the sketch sends
+    and returned as ("board", rows) without building a dictionary. Other lines go through the
+    JSON decoder and are returned as (type, dictionary).
+
+    @param line The raw bytes of a single line.
+    @return A (type, payload) tuple; the type is None for untyped data and error messages.
+    """
+    if line.startswith(b'{"type":"board"'):
+        match = _BOARD_RE.match(line)
+        if match:
+            cells = [cell.decode() for cell in match.groups()]
+            return "board", [cells[0:3], cells[3:6], cells[6:9]]
+    try:
+        response = _loads(line)
+    except ValueError:  # JSONDecodeError, or UnicodeDecodeError from the json fallback
+        return None, "Error: Invalid JSON received"
+    if not isinstance(response, dict):
+        return None, response
+    kind = response.get("type")
+    if kind == "board":
+        return kind, response.get("board")
+    return kind, response
+
+def update_game_board(board, buttons, last_board=None):
     """
     @brief Updates the GUI buttons to reflect the current state of the Tic-Tac-Toe board.
 
+    When the currently rendered board is given, only the cells that changed are reconfigured
+    and last_board is updated in place.
+
     @param board A 2D list representing the board state.
     @param buttons A 2D list of tkinter buttons.
+    @param last_board A 2D list of the texts shown by the buttons, or None to redraw every cell.
     """
+    if last_board is None:
+        for i in range(3):
+            for j in range(3):
+                buttons[i][j].config(text=board[i][j])
+        return
     for i in range(3):
+        row_new, row_old = board[i], last_board[i]
         for j in range(3):
-            buttons[i][j].config(text=board[i][j], font=("Arial", 14))
+            if row_new[j] != row_old[j]:
+                buttons[i][j].config(text=row_new[j])
+                row_old[j] = row_new[j]
 
 def send_move(uart, row, col):
     """
@@ -99,8 +321,7 @@ def send_move(uart, row, col):
     @param row The row index of the move (0-based).
     @param col The column index of the move (0-based).
     """
-    message = {"command": "MOVE", "row": row, "col": col}
-    uart.send_message(message)
+    uart.send_bytes(_MOVE_TMPL % (row, col))
 
 def set_mode(uart, mode):
     """
@@ -109,8 +330,7 @@ def set_mode(uart, mode):
     @param uart The UARTCommunication instance.
     @param mode The mode to set (0: User vs User, 1: User vs AI, 2: AI vs AI).
     """
-    message = {"command": "MODE", "mode": mode}
-    uart.send_message(message)
+    uart.send_bytes(_MODE_TMPL % mode)
 
 def reset_game(uart):
     """
@@ -118,37 +338,104 @@ def reset_game(uart):
 
     @param uart The UARTCommunication instance.
     """
-    message = {"command": "RESET"}
-    uart.send_message(message)
+    uart.send_bytes(_RESET_BYTES)
+
+def _handle_board(uart, board, buttons, output_text, root):
+    """
+    @brief Renders a board frame.
+
+    @param uart The UARTCommunication instance.
+    @param board A 2D list representing the board state.
+    @param buttons A 2D list of tkinter buttons.
+    @param output_text The tkinter scrolled text widget for displaying messages.
+    @param root The main tkinter window.
+    """
+    update_game_board(board, buttons, uart.last_board)
+
+def _handle_status(uart, response, buttons, output_text, root):
+    """
+    @brief Shows a status, mode, info or error message in the output area.
+
+    @param uart The UARTCommunication instance.
+    @param response The decoded message dictionary.
+    @param buttons A 2D list of tkinter buttons.
+    @param output_text The tkinter scrolled text widget for displaying messages.
+    @param root The main tkinter window.
+    """
+    output_text.insert(tk.END, f"Game status: {response['message']}\n")
+
+def _handle_win(uart, response, buttons, output_text, root):
+    """
+    @brief Shows the game result in the output area and in a dialog.
+
+    @param uart The UARTCommunication instance.
+    @param response The decoded win_status dictionary.
+    @param buttons A 2D list of tkinter buttons.
+    @param output_text The tkinter scrolled text widget for displaying messages.
+    @param root The main tkinter window.
+    """
+    _handle_status(uart, response, buttons, output_text, root)
+    root.after(0, messagebox.showinfo, "Win Status", response.get("message"))
+
+def _handle_default(uart, response, buttons, output_text, root):
+    """
+    @brief Handles untyped data: legacy board dictionaries, other dictionaries and raw values.
+
+    @param uart The UARTCommunication instance.
+    @param response The decoded data, or an error message.
+    @param buttons A 2D list of tkinter buttons.
+    @param output_text The tkinter scrolled text widget for displaying messages.
+    @param root The main tkinter window.
+    """
+    if isinstance(response, dict):
+        if "board" in response:
+            update_game_board(response["board"], buttons, uart.last_board)
+        else:
+            _handle_status(uart, response, buttons, output_text, root)
+    else:
+        output_text.insert(tk.END, f"Received: {response}\n")
+
+## Frame handlers keyed by the frame type; unknown types go to _handle_default.
+_HANDLERS = {
+    "board": _handle_board,
+    "win_status": _handle_win,
+    "game_status": _handle_status,
+    "game_mode": _handle_status,
+    "error": _handle_status,
+    "info": _handle_status,
+}
 
 def auto_receive(uart, buttons, output_text, root):
     """
-    @brief Automatically checks for incoming messages and updates the GUI.
+    @brief Drains the frames queued by the reader thread and updates the GUI.
 
     @param uart The UARTCommunication instance.
     @param buttons A 2D list of tkinter buttons.
     @param output_text The tkinter scrolled text widget for displaying messages.
     @param root The main tkinter window.
     """
-    try:
-        if uart.ser and uart.ser.is_open:
-            response = uart.receive_message()
-            if response and response != "Port not opened":
-                if isinstance(response, dict):
-                    if "board" in response:
-                        update_game_board(response["board"], buttons)
-                    else:
-                        output_text.insert(tk.END, f"Game status: {response['message']}\n")
-
-                    if response.get("type") == "win_status":
-                        thread = threading.Thread(target=messagebox.showinfo, args=("Win Status", response.get("message")))
-                        thread.start()
-                else:
-                    output_text.insert(tk.END, f"Received: {response}\n")
-                output_text.see(tk.END)
-    except Exception as e:
-        output_text.insert(tk.END, f"Error: {str(e)}\n")
-    root.after(100, lambda: auto_receive(uart, buttons, output_text, root))
+    received = False
+    while uart.rx_ring:
+        kind, response = uart.rx_ring.popleft()
+        received = True
+        try:
+            _HANDLERS.get(kind, _handle_default)(uart, response, buttons, output_text, root)
+        except Exception as e:
+            output_text.insert(tk.END, f"Error: {str(e)}\n")
+    if received:
+        _trim_output(output_text)
+        output_text.see(tk.END)
+
+def _trim_output(output_text):
+    """
+    @brief Deletes the oldest lines so the output area holds at most _MAX_OUTPUT_LINES lines.
+
+    @param output_text The tkinter scrolled text widget for displaying messages.
+    """
+    # Every message ends with "\n", so "end-1c" is on the empty line after the last message
+    excess = int(output_text.index("end-1c").split(".")[0]) - 1 - _MAX_OUTPUT_LINES
+    if excess > 0:
+        output_text.delete("1.0", f"{excess + 1}.0")
 
 def start_gui():
     """
@@ -167,26 +454,47 @@ def start_gui():
     port_combobox = ttk.Combobox(root, textvariable=port_var, values=uart.list_ports(), state="readonly", font=("Arial", 10))
     port_combobox.grid(row=0, column=1, padx=10, pady=5)
 
+    polling = False
+
+    def _tick():
+        """
+        @brief Drains the received frames and reschedules itself every _DRAIN_MS.
+
+        Only used on platforms where UARTCommunication.watch() is unavailable (Windows).
+        """
+        auto_receive(uart, buttons, output_text, root)
+        root.after(_DRAIN_MS, _tick)
+
     def open_port_callback():
         """
         @brief Callback function for opening the selected port.
         """
+        nonlocal polling
         status = uart.open_port(port_var.get())
         status_label.config(text=status)
         if "Connected" in status:
-            auto_receive(uart, buttons, output_text, root)
+            if not uart.watch(root, partial(auto_receive, uart, buttons, output_text, root)) and not polling:
+                # A single _tick chain serves every reopened port
+                polling = True
+                _tick()
         else:
             output_text.insert(tk.END, f"Failed to connect: {status}\n")
 
     open_button = tk.Button(root, text="Open Port", command=open_port_callback, font=("Arial", 10), relief="solid", width=10, height=1)
     open_button.grid(row=0, column=2, padx=10, pady=5)
 
+    def refresh_ports_callback():
+        """
+        @brief Callback function for re-enumerating the serial ports.
+        """
+        port_combobox.config(values=uart.list_ports(refresh=True))
+
     # Game board buttons
     buttons = [[None for _ in range(3)] for _ in range(3)]
     for i in range(3):
         for j in range(3):
-            button = tk.Button(root, text=" ", width=8, height=2, font=("Arial", 14), relief="solid",
-                               command=lambda row=i, col=j: send_move(uart, row, col), bg="#e0e0e0")
+            button = tk.Button(root, text=" ", width=8, height=2, font=_FONT, relief="solid",
+                               command=partial(send_move, uart, i, j), bg="#e0e0e0")
             button.grid(row=i + 1, column=j, padx=5, pady=5)
             buttons[i][j] = button
 
@@ -209,9 +517,13 @@ def start_gui():
     mode_button.grid(row=4, column=2, padx=10, pady=5)
 
     # Reset button
-    reset_button = tk.Button(root, text="Reset", command=lambda: reset_game(uart), font=("Arial", 10), relief="solid", width=10, height=1)
+    reset_button = tk.Button(root, text="Reset", command=partial(reset_game, uart), font=("Arial", 10), relief="solid", width=10, height=1)
     reset_button.grid(row=5, column=1, padx=10, pady=5)
 
+    # Refresh ports button
+    refresh_button = tk.Button(root, text="Refresh Ports", command=refresh_ports_callback, font=("Arial", 10), relief="solid", width=10, height=1)
+    refresh_button.grid(row=5, column=0, padx=10, pady=5)
+
     # Output text area
     output_text = scrolledtext.ScrolledText(root, width=40, height=8, wrap=tk.WORD, font=("Arial", 10))
     output_text.grid(row=6, column=0, columnspan=3, padx=10, pady=5)
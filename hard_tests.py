@@ -1,168 +1,185 @@
-import unittest
+import os
 import serial
-import json
 import time
 import argparse
 import sys
 
+import pytest
 
-class TicTacToeArduinoTests(unittest.TestCase):
-    @classmethod
-    def setUpClass(cls):
-        cls.ser = serial.Serial(cls.SERIAL_PORT, cls.BAUD_RATE, timeout=1)
-        time.sleep(2)
-
-    @classmethod
-    def tearDownClass(cls):
-        cls.ser.close()
-
-    def send_command(self, command_dict):
-        """Send a JSON command to the Arduino via serial."""
-        self.ser.write((json.dumps(command_dict) + '\n').encode())
-        time.sleep(0.5)
-
-    def receive_response(self):
-        """Receive a JSON response from the Arduino."""
-        if self.ser.in_waiting > 0:
-            line = self.ser.readline().decode().strip()
-            try:
-                return json.loads(line)
-            except json.JSONDecodeError:
-                return None
+# Encoder, decoder and command frames are shared with the GUI so both always send the same bytes
+from game import _dumps_line, _loads, _MOVE_TMPL, _RESET_BYTES
+
+# Environment variables holding the serial settings (set by --port/--baudrate when run as a script)
+PORT_ENV = "TICTACTOE_PORT"
+BAUD_RATE_ENV = "TICTACTOE_BAUDRATE"
+
+
+def _wait_line(ser, timeout=0.5):
+    """Return the next line as soon as the Arduino sends one, or b'' after timeout seconds."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if ser.in_waiting:
+            return ser.readline()
+        time.sleep(0.001)
+    return b''
+
+
+def send_frame(ser, payload):
+    """Send an encoded, newline-terminated frame to the Arduino via serial."""
+    ser.write(payload)
+
+
+def send_command(ser, command_dict):
+    """Send a JSON command to the Arduino via serial."""
+    send_frame(ser, _dumps_line(command_dict))
+
+
+def receive_response(ser, timeout=0.5):
+    """Receive a JSON response from the Arduino, waiting up to timeout seconds for it to arrive."""
+    line = _wait_line(ser, timeout)
+    try:
+        return _loads(line)
+    except ValueError:  # JSONDecodeError, or UnicodeDecodeError from the json fallback
         return None
 
-    def test_initialize_board(self):
-        """Test if the board initializes correctly after reset."""
-        self.send_command({"command": "RESET"})
-        response1 = self.receive_response()
-        response2 = self.receive_response()
-        self.assertIsNotNone(response2)
-        if response2["type"] == "game_status":
-            self.assertEqual(response2["message"], "Game reset.")
-            response2 = self.receive_response()
-        self.assertEqual(response2["type"], "board")
-        board_state = response2.get("board", [])
-        for row in board_state:
-            for cell in row:
-                self.assertEqual(cell, " ")
-
-    def test_make_valid_move(self):
-        """Test if a valid move updates the board correctly."""
-        self.send_command({"command": "RESET"})
-        self.receive_response()
-        self.receive_response()
-
-        self.send_command({"command": "MOVE", "row": 0, "col": 0})
-        response = self.receive_response()
-        self.assertEqual(response["type"], "board")
-        board_state = response.get("board", [])
-        self.assertEqual(board_state[0][0], "X")
-
-    def test_make_invalid_move(self):
-        """Test if an invalid move is correctly handled."""
-        self.send_command({"command": "RESET"})
-        self.receive_response()
-        self.receive_response()
-
-        self.send_command({"command": "MOVE", "row": 0, "col": 0})
-        self.receive_response()
-
-        self.send_command({"command": "MOVE", "row": 0, "col": 0})
-        response = self.receive_response()
-        self.assertIsNotNone(response)
-        if response["type"] == "error":
-            self.assertEqual(response["message"], "Invalid move.")
-        else:
-            self.assertEqual(response["type"], "board")
-
-    def test_check_win(self):
-        """Test if the game detects a win correctly."""
-        self.send_command({"command": "RESET"})
-        self.receive_response()
-        self.receive_response()
-
-        moves = [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)]
-        for row, col in moves:
-            self.send_command({"command": "MOVE", "row": row, "col": col})
-            self.receive_response()
-
-        response = self.receive_response()
-        self.assertEqual(response["type"], "win_status")
-        self.assertEqual(response["message"], "Player X wins!")
-
-    def test_draw(self):
-        """Test if the game correctly detects a draw."""
-        self.send_command({"command": "RESET"})
-        self.receive_response()
-        self.receive_response()
-
-        moves = [
-            (0, 0), (0, 1), (0, 2),
-            (1, 1), (1, 0), (1, 2),
-            (2, 1), (2, 0), (2, 2)
-        ]
-        for row, col in moves:
-            self.send_command({"command": "MOVE", "row": row, "col": col})
-            self.receive_response()
-
-        response = self.receive_response()
-        self.assertEqual(response["type"], "win_status")
-        self.assertEqual(response["message"], "It's a draw!")
-
-    def test_game_mode_switch(self):
-        """Test switching between different game modes."""
-        self.send_command({"command": "MODE", "mode": 1})
-        responses = {"game_mode": False, "game_status": False, "board": False}
-        for _ in range(5):
-            response = self.receive_response()
-            if response:
-                response_type = response["type"]
-                if response_type == "game_mode":
-                    responses["game_mode"] = True
-                    self.assertIn("Game mode set to 1", response["message"])
-                elif response_type == "game_status":
-                    responses["game_status"] = True
-                    self.assertEqual(response["message"], "Game reset.")
-
-                if all(responses.values()):
-                    break
-
-        self.send_command({"command": "MODE", "mode": 2})
-        responses = {"game_mode": False, "game_status": False, "board": False}
-
-        for _ in range(5):
-            response = self.receive_response()
+
+def send_recv(ser, payload):
+    """Send a frame and return the next response to it."""
+    send_frame(ser, payload)
+    return receive_response(ser)
+
+
+def _drain_until(ser, type_, timeout=2.0):
+    """Consume responses until one of the given type arrives and return it (None on timeout)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = receive_response(ser, deadline - time.monotonic())
+        if response and response["type"] == type_:
+            return response
+    return None
+
+
+@pytest.fixture(scope="session")
+def ser():
+    """Open the serial port once for the whole session."""
+    port = os.environ.get(PORT_ENV)
+    if not port:
+        pytest.skip(f"{PORT_ENV} is not set, no Arduino to test against")
+    s = serial.Serial(port, int(os.environ.get(BAUD_RATE_ENV, "9600")), timeout=1)
+    time.sleep(2)  # Opening the port resets the Arduino
+    yield s
+    s.close()
+
+
+@pytest.fixture
+def board(ser):
+    """Reset the game and consume the reset status and the empty board."""
+    ser.reset_input_buffer()
+    send_frame(ser, _RESET_BYTES)
+    assert _drain_until(ser, "board") is not None, "RESET was not acknowledged"
+    return ser
+
+
+def test_initialize_board(ser):
+    """Test if the board initializes correctly after reset."""
+    ser.reset_input_buffer()
+    send_frame(ser, _RESET_BYTES)
+    response = receive_response(ser)
+    assert response is not None
+    if response["type"] == "game_status":
+        assert response["message"] == "Game reset."
+        response = receive_response(ser)
+    assert response["type"] == "board"
+    board_state = response.get("board", [])
+    for row in board_state:
+        for cell in row:
+            assert cell == " "
+
+
+def test_make_valid_move(board):
+    """Test if a valid move updates the board correctly."""
+    response = send_recv(board, _MOVE_TMPL % (0, 0))
+    assert response["type"] == "board"
+    board_state = response.get("board", [])
+    assert board_state[0][0] == "X"
+
+
+def test_make_invalid_move(board):
+    """Test if an invalid move is correctly handled."""
+    send_recv(board, _MOVE_TMPL % (0, 0))
+
+    response = send_recv(board, _MOVE_TMPL % (0, 0))
+    assert response is not None
+    if response["type"] == "error":
+        assert response["message"] == "Invalid move."
+    else:
+        assert response["type"] == "board"
+
+
+def test_check_win(board):
+    """Test if the game detects a win correctly."""
+    moves = [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)]
+    for row, col in moves:
+        send_recv(board, _MOVE_TMPL % (row, col))
+
+    response = receive_response(board)
+    assert response["type"] == "win_status"
+    assert response["message"] == "Player X wins!"
+
+
+def test_draw(board):
+    """Test if the game correctly detects a draw."""
+    moves = [
+        (0, 0), (0, 1), (0, 2),
+        (1, 1), (1, 0), (1, 2),
+        (2, 1), (2, 0), (2, 2)
+    ]
+    for row, col in moves:
+        send_recv(board, _MOVE_TMPL % (row, col))
+
+    response = receive_response(board)
+    assert response["type"] == "win_status"
+    assert response["message"] == "It's a draw!"
+
+
+# Checks for the responses to a MODE command, keyed by response type
+_MODE_CHECKS = {
+    "game_mode": lambda response, mode: f"Game mode set to {mode}" in response["message"],
+    "game_status": lambda response, mode: response["message"] == "Game reset.",
+    "board": lambda response, mode: all(cell == " " for row in response["board"] for cell in row),
+}
+
+
+def test_game_mode_switch(ser):
+    """Test switching between different game modes."""
+    for mode in (1, 2):
+        send_command(ser, {"command": "MODE", "mode": mode})
+        responses = dict.fromkeys(_MODE_CHECKS, False)
+        iterations = 0
+        while not all(responses.values()) and iterations < 5:
+            iterations += 1
+            response = receive_response(ser)
             if response:
-                response_type = response["type"]
-                if response_type == "game_mode":
-                    responses["game_mode"] = True
-                    self.assertIn("Game mode set to 2", response["message"])
-                elif response_type == "game_status":
-                    responses["game_status"] = True
-                    self.assertEqual(response["message"], "Game reset.")
-                elif response_type == "board":
-                    responses["board"] = True
-                    board_state = response["board"]
-                    for row in board_state:
-                        for cell in row:
-                            self.assertEqual(cell, " ")
-                if all(responses.values()):
-                    break
-
-    def test_handle_ai_vs_ai(self):
-        """Test handling AI vs AI gameplay."""
-        self.send_command({"command": "MODE", "mode": 2})
-        self.receive_response()
-        self.receive_response()
-
-        max_iterations = 100
-        for _ in range(max_iterations):
-            response = self.receive_response()
-            if response and response["type"] == "win_status":
-                self.assertIn(response["message"], ["Player X wins!", "Player O wins!", "It's a draw!"])
-                break
-        else:
-            self.fail("AI vs AI test did not conclude within the iteration limit.")
+                check = _MODE_CHECKS.get(response["type"])
+                if check:
+                    assert check(response, mode), response
+                    responses[response["type"]] = True
+
+
+def test_handle_ai_vs_ai(ser):
+    """Test handling AI vs AI gameplay."""
+    send_command(ser, {"command": "MODE", "mode": 2})
+    receive_response(ser)
+    receive_response(ser)
+
+    max_iterations = 100
+    for _ in range(max_iterations):
+        response = receive_response(ser)
+        if response and response["type"] == "win_status":
+            assert response["message"] in ["Player X wins!", "Player O wins!", "It's a draw!"]
+            break
+    else:
+        pytest.fail("AI vs AI test did not conclude within the iteration limit.")
 
 
 if __name__ == '__main__':
@@ -172,12 +189,9 @@ if __name__ == '__main__':
     parser.add_argument('--baudrate', type=int, default=9600, help="Baud rate for serial communication")
     args, remaining_args = parser.parse_known_args()
 
-    # Pass arguments to the test class
-    TicTacToeArduinoTests.SERIAL_PORT = args.port
-    TicTacToeArduinoTests.BAUD_RATE = args.baudrate
-
-    # Remove custom arguments from sys.argv to avoid unittest conflicts
-    sys.argv = [sys.argv[0]] + remaining_args
+    # Pass the serial settings to the fixtures, pytest imports this file again as a test module
+    os.environ[PORT_ENV] = args.port
+    os.environ[BAUD_RATE_ENV] = str(args.baudrate)
 
-    # Run tests
-    unittest.main()
+    # Run tests, forwarding any remaining arguments to pytest
+    sys.exit(pytest.main([__file__] + remaining_args))
@@ -7,13 +7,17 @@
 # logger.addHandler(fh)
 
 
+import io
+import os
+import sys
 import unittest
 from unittest.mock import MagicMock, patch
 from tkinter import Tk
 from io import StringIO
-from game import UARTCommunication, update_game_board, send_move, set_mode, reset_game, auto_receive
+from game import UARTCommunication, update_game_board, send_move, set_mode, reset_game, auto_receive, decode_frame, _trim_output, _MAX_OUTPUT_LINES, _RX_RING_SIZE
+from TicTacToeSWPart import uart_communicate
 import tkinter as tk
-from tkinter import scrolledtext
+from tkinter import scrolledtext, messagebox
 
 
 class TestUARTCommunication(unittest.TestCase):
@@ -24,7 +28,16 @@ class TestUARTCommunication(unittest.TestCase):
     def test_list_ports(self, mock_comports):
         mock_comports.return_value = [MagicMock(device="COM3"), MagicMock(device="COM4")]
         ports = self.uart.list_ports()
-        self.assertEqual(ports, ["COM3", "COM4"])
+        self.assertEqual(ports, ("COM3", "COM4"))
+
+    @patch('serial.tools.list_ports.comports')
+    def test_list_ports_cached(self, mock_comports):
+        mock_comports.return_value = [MagicMock(device="COM3")]
+        self.uart.list_ports()
+        mock_comports.return_value = [MagicMock(device="COM3"), MagicMock(device="COM4")]
+        self.assertEqual(self.uart.list_ports(), ("COM3",))
+        self.assertEqual(self.uart.list_ports(refresh=True), ("COM3", "COM4"))
+        self.assertEqual(mock_comports.call_count, 2)
 
     @patch('serial.Serial')
     def test_open_port_success(self, mock_serial):
@@ -46,6 +59,7 @@ class TestUARTCommunication(unittest.TestCase):
         self.uart.ser = mock_serial()
         result = self.uart.send_message({"command": "MOVE", "row": 0, "col": 1})
         self.assertIn("Sent:", result)
+        self.uart.ser.write.assert_called_once_with(b'{"command":"MOVE","row":0,"col":1}\n')
 
     @patch('serial.Serial')
     def test_send_message_failure(self, mock_serial):
@@ -54,6 +68,18 @@ class TestUARTCommunication(unittest.TestCase):
         result = self.uart.send_message({"command": "MOVE", "row": 0, "col": 1})
         self.assertEqual(result, "Port not opened")
 
+    @patch('serial.Serial')
+    def test_send_bytes_success(self, mock_serial):
+        mock_serial.return_value = MagicMock(is_open=True)
+        self.uart.ser = mock_serial()
+        result = self.uart.send_bytes(b'{"command":"RESET"}\n')
+        self.uart.ser.write.assert_called_once_with(b'{"command":"RESET"}\n')
+        self.assertEqual(result, 'Sent: {"command":"RESET"}')
+
+    def test_send_bytes_no_port(self):
+        result = self.uart.send_bytes(b'{"command":"RESET"}\n')
+        self.assertEqual(result, "Port not opened")
+
     @patch('serial.Serial')
     def test_receive_message_success(self, mock_serial):
         mock_serial.return_value = MagicMock(is_open=True, in_waiting=1)
@@ -92,31 +118,36 @@ class TestGameFunctions(unittest.TestCase):
                 self.assertEqual(buttons[i][j]["text"], board[i][j])
         root.destroy()
 
-    @patch.object(UARTCommunication, 'send_message')
-    def test_send_move(self, mock_send_message):
+    def test_update_game_board_changed_cells_only(self):
+        buttons = [[MagicMock() for _ in range(3)] for _ in range(3)]
+        last_board = [["X", " ", " "], [" ", " ", " "], [" ", " ", " "]]
+        board = [["X", " ", " "], [" ", "O", " "], [" ", " ", " "]]
+        update_game_board(board, buttons, last_board)
+        buttons[1][1].config.assert_called_once_with(text="O")
+        buttons[0][0].config.assert_not_called()
+        self.assertEqual(last_board, board)
+
+    @patch.object(UARTCommunication, 'send_bytes')
+    def test_send_move(self, mock_send_bytes):
         send_move(self.uart, 1, 1)
-        mock_send_message.assert_called_with({"command": "MOVE", "row": 1, "col": 1})
+        mock_send_bytes.assert_called_with(b'{"command":"MOVE","row":1,"col":1}\n')
 
-    @patch.object(UARTCommunication, 'send_message')
-    def test_set_mode(self, mock_send_message):
+    @patch.object(UARTCommunication, 'send_bytes')
+    def test_set_mode(self, mock_send_bytes):
         set_mode(self.uart, 1)
-        mock_send_message.assert_called_with({"command": "MODE", "mode": 1})
+        mock_send_bytes.assert_called_with(b'{"command":"MODE","mode":1}\n')
 
-    @patch.object(UARTCommunication, 'send_message')
-    def test_reset_game(self, mock_send_message):
+    @patch.object(UARTCommunication, 'send_bytes')
+    def test_reset_game(self, mock_send_bytes):
         reset_game(self.uart)
-        mock_send_message.assert_called_with({"command": "RESET"})
+        mock_send_bytes.assert_called_with(b'{"command":"RESET"}\n')
 
-    @patch('serial.Serial')
-    def test_auto_receive_no_data(self, mock_serial):
-        mock_serial.return_value = MagicMock(is_open=True, in_waiting=2)
-        self.uart.ser = mock_serial()
+    def test_auto_receive_no_data(self):
         root = Tk()
         buttons = [[tk.Button(root, text=" ") for _ in range(3)] for _ in range(3)]
         output_text = scrolledtext.ScrolledText(root, width=50, height=10)
 
-        # Simulate no data received
-        mock_serial().readline.return_value = b''
+        # Simulate no data received: the reader thread queued nothing
         auto_receive(self.uart, buttons, output_text, root)
 
         # Check if no board update happens
@@ -126,15 +157,37 @@ class TestGameFunctions(unittest.TestCase):
 
         root.destroy()
 
+    def test_trim_output_keeps_max_lines(self):
+        output_text = MagicMock()
+        output_text.index.return_value = f"{_MAX_OUTPUT_LINES + 1}.0"  # Exactly the limit, plus the empty last line
+        _trim_output(output_text)
+        output_text.delete.assert_not_called()
+
+        output_text.index.return_value = f"{_MAX_OUTPUT_LINES + 4}.0"
+        _trim_output(output_text)
+        output_text.delete.assert_called_once_with("1.0", "4.0")
+
+    def test_rx_ring_overwrites_oldest(self):
+        for i in range(_RX_RING_SIZE + 2):
+            self.uart.rx_ring.append((None, i))
+        self.assertEqual(len(self.uart.rx_ring), _RX_RING_SIZE)
+        self.assertEqual(self.uart.rx_ring[0], (None, 2))
+
+    def test_auto_receive_win_status_dialog(self):
+        self.uart.rx_ring.append(decode_frame(b'{"type": "win_status", "message": "Player X wins!"}'))
+        root = MagicMock()
+        output_text = MagicMock()
+        output_text.index.return_value = "2.0"
+        auto_receive(self.uart, [[MagicMock()] * 3] * 3, output_text, root)
+        output_text.insert.assert_called_once_with(tk.END, "Game status: Player X wins!\n")
+        root.after.assert_called_once_with(0, messagebox.showinfo, "Win Status", "Player X wins!")
+
     def test_uart_initialization(self):
         uart = UARTCommunication()
         self.assertIsNone(uart.ser)
 
-    @patch('serial.Serial')
-    def test_auto_receive_valid_response(self, mock_serial):
-        mock_serial.return_value = MagicMock(is_open=True, in_waiting=1)
-        mock_serial().readline.return_value = b'{"board": [["X", "O", "X"], ["O", "X", "O"], ["X", "O", "X"]]}'
-        self.uart.ser = mock_serial()
+    def test_auto_receive_valid_response(self):
+        self.uart.rx_ring.append(decode_frame(b'{"board": [["X", "O", "X"], ["O", "X", "O"], ["X", "O", "X"]]}'))
         root = Tk()
         buttons = [[tk.Button(root, text=" ") for _ in range(3)] for _ in range(3)]
         output_text = scrolledtext.ScrolledText(root, width=50, height=10)
@@ -148,11 +201,8 @@ class TestGameFunctions(unittest.TestCase):
                 self.assertEqual(buttons[i][j]["text"], ["X", "O", "X", "O", "X", "O", "X", "O", "X"][i * 3 + j])
         root.destroy()
 
-    @patch('serial.Serial')
-    def test_auto_receive_invalid_json(self, mock_serial):
-        mock_serial.return_value = MagicMock(is_open=True, in_waiting=1)
-        mock_serial().readline.return_value = b'{"board": [["X", "O", "X"], ["O", "X", "O"]]}'
-        self.uart.ser = mock_serial()
+    def test_auto_receive_invalid_json(self):
+        self.uart.rx_ring.append(decode_frame(b'{"board": [["X", "O", "X"], ["O", "X", "O"]]}'))
         root = Tk()
         buttons = [[tk.Button(root, text=" ") for _ in range(3)] for _ in range(3)]
         output_text = scrolledtext.ScrolledText(root, width=50, height=10)
@@ -164,6 +214,134 @@ class TestGameFunctions(unittest.TestCase):
         self.assertIn("Error:", output_text.get("1.0", tk.END))
         root.destroy()
 
+    def test_decode_frame_invalid_json(self):
+        self.assertEqual(decode_frame(b'{"board": }'), (None, "Error: Invalid JSON received"))
+
+    def test_decode_frame_board_fast_path(self):
+        kind, board = decode_frame(b'{"type":"board","board":[["X"," "," "],[" ","O"," "],[" "," ","X"]]}\r')
+        self.assertEqual(kind, "board")
+        self.assertEqual(board, [["X", " ", " "], [" ", "O", " "], [" ", " ", "X"]])
+
+    def test_decode_frame_board_garbage_byte(self):
+        frame = decode_frame(b'{"type":"board","board":[["\xff"," "," "],[" "," "," "],[" "," "," "]]}')
+        self.assertEqual(frame, (None, "Error: Invalid JSON received"))
+
+    def test_decode_frame_typed_message(self):
+        frame = decode_frame(b'{"type": "win_status", "message": "Player X wins!"}')
+        self.assertEqual(frame, ("win_status", {"type": "win_status", "message": "Player X wins!"}))
+        self.assertEqual(decode_frame(b'{"type": "board", "board": [["X"]]}'), ("board", [["X"]]))
+
+    @patch('serial.Serial')
+    def test_reader_thread_queues_frames(self, mock_serial):
+        mock_serial.return_value = MagicMock(is_open=True, in_waiting=0)
+        mock_serial.return_value.fileno.side_effect = io.UnsupportedOperation  # As on Windows, read() blocks
+        mock_serial.return_value.read.side_effect = [b'\r\n{"type": "in', b'fo", "message": "hi"}\r\n{"type"',
+                                                     Exception("Port closed")]
+        self.uart.open_port("COM3")
+        self.uart._reader.join(timeout=1)
+        self.assertEqual(self.uart.rx_ring.popleft(), ("info", {"type": "info", "message": "hi"}))
+        self.assertEqual(self.uart.rx_ring.popleft(), (None, "Error: Port closed"))
+        self.assertFalse(self.uart.rx_ring)
+
+
+    @unittest.skipIf(sys.platform == "win32", "Tk file handlers are POSIX only")
+    def test_watch_wakes_tk_on_frames(self):
+        root = MagicMock()
+        callback = MagicMock()
+        self.assertTrue(self.uart.watch(root, callback))
+        fd, mask, on_wake = root.tk.createfilehandler.call_args[0]
+        self.uart.rx_ring.append((None, "frame"))
+        self.uart._wake()
+        on_wake(fd, mask)
+        callback.assert_called_once_with()
+
+    @unittest.skipIf(sys.platform == "win32", "Tk file handlers are POSIX only")
+    def test_watch_signals_frames_queued_before(self):
+        self.uart.rx_ring.append((None, "frame"))
+        self.assertTrue(self.uart.watch(MagicMock(), MagicMock()))
+        self.assertEqual(os.read(self.uart._wake_r, 4096), b"\0")
+
+    @unittest.skipIf(sys.platform == "win32", "select() only supports sockets on Windows")
+    def test_reader_thread_waits_for_readable_port(self):
+        read_fd, write_fd = os.pipe()
+        self.addCleanup(os.close, read_fd)
+        self.addCleanup(os.close, write_fd)
+        ser = MagicMock(is_open=True, in_waiting=0)
+        ser.fileno.return_value = read_fd
+        ser.read.side_effect = lambda size: os.read(read_fd, 4096)
+        with patch('serial.Serial', return_value=ser):
+            self.uart.open_port("COM3")
+        reader = self.uart._reader
+        os.write(write_fd, b'{"type": "info", "message": "hi"}\r\n')
+        for _ in range(100):
+            if self.uart.rx_ring:
+                break
+            reader.join(timeout=0.01)
+        self.assertEqual(self.uart.rx_ring.popleft(), ("info", {"type": "info", "message": "hi"}))
+        self.uart._reader = None
+        reader.join(timeout=1)
+        self.assertFalse(reader.is_alive())
+
+    def test_watch_unavailable(self):
+        root = MagicMock()
+        del root.tk.createfilehandler
+        self.assertFalse(self.uart.watch(root, MagicMock()))
+
+
+class TestUARTMonitor(unittest.TestCase):
+    def setUp(self):
+        self.uart = uart_communicate.UARTCommunication()
+
+    def test_auto_receive_keeps_max_lines(self):
+        output_text = MagicMock()
+        output_text.index.return_value = f"{uart_communicate.MAX_OUTPUT_LINES + 3}.0"
+        self.uart.rx_ring.extend(["a", "b"])
+        uart_communicate.auto_receive(self.uart, output_text, MagicMock(), MagicMock())
+        self.assertEqual(output_text.insert.call_count, 2)
+        output_text.delete.assert_called_once_with("1.0", "3.0")
+        self.assertFalse(self.uart.rx_ring)
+
+    @unittest.skipIf(sys.platform == "win32", "Tk file handlers are POSIX only")
+    def test_watch_signals_lines_queued_before(self):
+        self.uart.rx_ring.append("hello")
+        self.assertTrue(self.uart.watch(MagicMock(), MagicMock()))
+        self.assertEqual(os.read(self.uart.wake_r, 4096), b"\0")
+
+    def test_decode_line(self):
+        self.assertEqual(uart_communicate.decode_line(b"hello\r\n"), "hello")
+        self.assertEqual(uart_communicate.decode_line(b"hello\n"), "hello")
+        self.assertEqual(uart_communicate.decode_line(b"\xffX"), "\ufffdX")
+        self.assertEqual(uart_communicate.decode_line(b""), "")
+
+    def test_receive_message_success(self):
+        self.uart.ser = MagicMock(is_open=True)
+        self.uart.ser.readline.return_value = b"Game reset.\r\n"
+        self.assertEqual(self.uart.receive_message(), "Game reset.")
+        self.assertFalse(self.uart.stop_auto_receive)
+
+    def test_receive_message_error(self):
+        self.uart.ser = MagicMock(is_open=True)
+        self.uart.ser.readline.side_effect = OSError("Device disconnected")
+        self.assertEqual(self.uart.receive_message(), "Error: Device disconnected")
+        self.assertTrue(self.uart.stop_auto_receive)
+
+    def test_receive_message_no_port(self):
+        self.assertEqual(self.uart.receive_message(), "Port not opened")
+
+    @unittest.skipIf(sys.platform == "win32", "select() only supports sockets on Windows")
+    def test_reader_stops_on_disconnect(self):
+        read_fd, write_fd = os.pipe()
+        self.addCleanup(os.close, read_fd)
+        os.set_blocking(read_fd, False)
+        os.close(write_fd)  # The port is readable but returns no data, as after a hangup
+        self.uart.ser = MagicMock(is_open=True)
+        self.uart.ser.fileno.return_value = read_fd
+        self.uart.start_reader()
+        self.uart.reader.join(timeout=1)
+        self.assertFalse(self.uart.reader.is_alive())
+        self.assertTrue(self.uart.stop_auto_receive)
+        self.assertIn("device reports readiness to read", self.uart.rx_ring.popleft())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -71,17 +71,17 @@ class TestGameCommands(unittest.TestCase):
 
     def test_send_move(self):
         send_move(self.uart, 1, 1)
-        self.uart.send_message.assert_called_once_with({"command": "MOVE", "row": 1, "col": 1})
+        self.uart.send_bytes.assert_called_once_with(b'{"command":"MOVE","row":1,"col":1}\n')
         logging.info("test_send_move passed.")
 
     def test_set_mode(self):
         set_mode(self.uart, 1)
-        self.uart.send_message.assert_called_once_with({"command": "MODE", "mode": 1})
+        self.uart.send_bytes.assert_called_once_with(b'{"command":"MODE","mode":1}\n')
         logging.info("test_set_mode passed.")
 
     def test_reset_game(self):
         reset_game(self.uart)
-        self.uart.send_message.assert_called_once_with({"command": "RESET"})
+        self.uart.send_bytes.assert_called_once_with(b'{"command":"RESET"}\n')
         logging.info("test_reset_game passed.")
 
 